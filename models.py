@@ -1,7 +1,19 @@
-import psycopg2
-import psycopg2.extras
+import psycopg
+from psycopg import sql
+from psycopg.conninfo import make_conninfo
+from psycopg.rows import class_row, dict_row
+from psycopg_pool import ConnectionPool
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
 import bcrypt
-from datetime import datetime
+import msgpack
+import orjson
+import redis
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Optional
 import os
 from dotenv import load_dotenv
 
@@ -15,81 +27,267 @@ DB_NAME = os.getenv('DB_NAME', 'ipos')
 DB_USER = os.getenv('DB_USER', 'postgres')
 DB_PASSWORD = os.getenv('DB_PASSWORD', '')
 
-def get_db_connection():
-    """Create a connection to the PostgreSQL database"""
-    conn = psycopg2.connect(
+# Redis/Valkey result cache; caching is disabled when REDIS_URL is not set.
+# Short socket timeouts (seconds) so an unresponsive Redis degrades to a
+# cache miss instead of stalling every read.
+REDIS_URL = os.getenv('REDIS_URL')
+REDIS_SOCKET_TIMEOUT = float(os.getenv('REDIS_SOCKET_TIMEOUT', '0.25'))
+REDIS_CONNECT_TIMEOUT = float(os.getenv('REDIS_CONNECT_TIMEOUT', '0.25'))
+IPO_CACHE_TTL = 60
+WATCHLIST_CACHE_TTL = 30
+
+# argon2id cost parameters for password hashing (memory cost is in KiB)
+ARGON2_TIME_COST = int(os.getenv('ARGON2_TIME_COST', '2'))
+ARGON2_MEMORY_COST = int(os.getenv('ARGON2_MEMORY_COST', '65536'))
+ARGON2_PARALLELISM = int(os.getenv('ARGON2_PARALLELISM', '2'))
+
+# Process-wide connection pool, so each query reuses a warm connection
+# instead of paying the TCP/TLS/auth handshake on every call
+POOL = ConnectionPool(
+    conninfo=make_conninfo(
         host=DB_HOST,
         port=DB_PORT,
         dbname=DB_NAME,
         user=DB_USER,
         password=DB_PASSWORD
-    )
-    return conn
+    ),
+    min_size=2,
+    max_size=(os.cpu_count() or 1) * 2,
+    max_idle=300,
+    timeout=10,
+    # Prepare every statement on first use so repeat calls on the same
+    # connection skip parse/plan on the server
+    kwargs={'prepare_threshold': 0},
+    open=True
+)
+
+# Worker threads for running independent queries side by side, each on its
+# own pooled connection
+QUERY_EXECUTOR = ThreadPoolExecutor(max_workers=POOL.max_size)
+
+PH = PasswordHasher(
+    time_cost=ARGON2_TIME_COST,
+    memory_cost=ARGON2_MEMORY_COST,
+    parallelism=ARGON2_PARALLELISM
+)
+
+CACHE = redis.Redis.from_url(
+    REDIS_URL,
+    socket_timeout=REDIS_SOCKET_TIMEOUT,
+    socket_connect_timeout=REDIS_CONNECT_TIMEOUT
+) if REDIS_URL else None
+
+def get_db_connection():
+    """
+    Borrow a connection from the pool.
+    Use as a context manager: the transaction is committed on success, rolled
+    back on error, and the connection is returned to the pool either way.
+    """
+    return POOL.connection()
+
+def check_db_pool():
+    """
+    Test the idle connections in the pool and replace any that are broken.
+    Meant to be run periodically (e.g. from the scheduler), so connections
+    dropped by the server are reaped before a request borrows them.
+    """
+    POOL.check()
+
+# ---------------------------
+# Cache Helpers
+# ---------------------------
+
+# Writers drop the affected keys after committing, but that does not rule out
+# stale entries: a reader that missed and selected the old row before the
+# commit can still setex it after the delete. Staleness is therefore bounded
+# by IPO_CACHE_TTL / WATCHLIST_CACHE_TTL, not prevented. IPO writes
+# (store_ipo, store_ipos, bulk_load_ipos) only drop ipo:* keys; wl:* entries
+# embed IPO columns too and pick up changes when they expire.
+
+# msgpack extension codes for the column types it can't encode natively
+EXT_DATETIME = 1
+EXT_DATE = 2
+EXT_DECIMAL = 3
+
+def encode_ext(value):
+    """Encode datetime/date/Decimal values as msgpack extension types."""
+    if isinstance(value, datetime):
+        return msgpack.ExtType(EXT_DATETIME, value.isoformat().encode('utf-8'))
+    if isinstance(value, date):
+        return msgpack.ExtType(EXT_DATE, value.isoformat().encode('utf-8'))
+    if isinstance(value, Decimal):
+        return msgpack.ExtType(EXT_DECIMAL, str(value).encode('utf-8'))
+    raise TypeError(f'Cannot cache value of type {type(value).__name__}')
+
+def decode_ext(code, data):
+    """Decode the extension types written by encode_ext."""
+    text = data.decode('utf-8')
+    if code == EXT_DATETIME:
+        return datetime.fromisoformat(text)
+    if code == EXT_DATE:
+        return date.fromisoformat(text)
+    if code == EXT_DECIMAL:
+        return Decimal(text)
+    return msgpack.ExtType(code, data)
+
+def cache_get(key):
+    """
+    Return the cached value for key, or None on a miss.
+    Redis errors and undecodable payloads are treated as a miss so the
+    database stays the fallback.
+    """
+    if CACHE is None:
+        return None
+    try:
+        payload = CACHE.get(key)
+    except redis.RedisError:
+        return None
+    if payload is None:
+        return None
+    try:
+        return msgpack.unpackb(payload, ext_hook=decode_ext)
+    except (ValueError, ArithmeticError):
+        # Corrupt or foreign payload (bad msgpack, bad ISO date, bad Decimal)
+        return None
+
+def cache_set(key, value, ttl):
+    """Cache value under key for ttl seconds."""
+    if CACHE is None:
+        return
+    try:
+        CACHE.setex(key, ttl, msgpack.packb(value, default=encode_ext))
+    except redis.RedisError:
+        pass
+
+def cache_delete(*keys):
+    """Drop keys from the cache."""
+    if CACHE is None or not keys:
+        return
+    try:
+        CACHE.delete(*keys)
+    except redis.RedisError:
+        pass
 
 def init_db():
-    """Initialize the database with required tables"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Create Users table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS Users (
-        user_id SERIAL PRIMARY KEY,
-        username VARCHAR(255) UNIQUE NOT NULL,
-        email VARCHAR(255) UNIQUE NOT NULL,
-        password_hash VARCHAR(255) NOT NULL,
-        first_name VARCHAR(255),
-        last_name VARCHAR(255),
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    ''')
-
-    # Create IPOs table for scraped IPO data
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS IPOs (
-        ipo_id SERIAL PRIMARY KEY,
-        name VARCHAR(255) NOT NULL,
-        symbol VARCHAR(20) NOT NULL,
-        company_name VARCHAR(255),
-        offering_price DECIMAL(10, 2),
-        total_shares INTEGER,
-        ipo_date DATE,
-        status VARCHAR(20) DEFAULT 'upcoming',
-        description TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    ''')
-
-    # Create Ongoing_Watchlist table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS Ongoing_Watchlist (
-        watchlist_id SERIAL PRIMARY KEY,
-        user_id INTEGER NOT NULL,
-        ipo_id INTEGER NOT NULL,
-        expiry_date DATE,
-        FOREIGN KEY (user_id) REFERENCES Users (user_id),
-        FOREIGN KEY (ipo_id) REFERENCES IPOs (ipo_id)
-    )
-    ''')
-
-    # Create Past_Investments table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS Past_Investments (
-        investment_id SERIAL PRIMARY KEY,
-        user_id INTEGER NOT NULL,
-        ipo_id INTEGER NOT NULL,
-        shares_purchased INTEGER NOT NULL,
-        purchase_price DECIMAL(10, 2) NOT NULL,
-        sold_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        status VARCHAR(20) DEFAULT 'pending',
-        FOREIGN KEY (user_id) REFERENCES Users (user_id),
-        FOREIGN KEY (ipo_id) REFERENCES IPOs (ipo_id)
-    )
-    ''')
+    """
+    Initialize the database with required tables.
+
+    Server tuning (postgresql.conf, not set from here):
+    - io_method = io_uring (PostgreSQL 18+, Linux, built with liburing) issues
+      asynchronous reads for sequential scans, bitmap heap scans and vacuum,
+      which helps read-heavy scans as the tables grow. Use io_method = worker
+      where io_uring is unavailable. It does not touch WAL writes or commit
+      flushes, which stay synchronous, so commit latency on the
+      add_investment/store_ipo write paths is unchanged.
+    - shared_buffers should be large enough to keep IPOs, Ongoing_Watchlist
+      and their indexes resident; these tables are small, so the default is
+      usually enough.
+    """
+    # All DDL goes out as one multi-statement script, i.e. a single round-trip.
+    # It runs inside the pooled connection's transaction, so a failure part way
+    # through rolls back every statement. prepare=False because a script with
+    # several statements can't be prepared (and one-off DDL gains nothing).
+    with get_db_connection() as conn, conn.cursor() as cursor:
+        cursor.execute('''
+        -- Create Users table
+        CREATE TABLE IF NOT EXISTS Users (
+            user_id SERIAL PRIMARY KEY,
+            username VARCHAR(255) UNIQUE NOT NULL,
+            email VARCHAR(255) UNIQUE NOT NULL,
+            password_hash VARCHAR(255) NOT NULL,
+            first_name VARCHAR(255),
+            last_name VARCHAR(255),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        -- Create IPOs table for scraped IPO data
+        CREATE TABLE IF NOT EXISTS IPOs (
+            ipo_id SERIAL PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            symbol VARCHAR(20) NOT NULL,
+            company_name VARCHAR(255),
+            offering_price DECIMAL(10, 2),
+            total_shares INTEGER,
+            ipo_date DATE,
+            status VARCHAR(20) DEFAULT 'upcoming',
+            description TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        -- Create Ongoing_Watchlist table
+        CREATE TABLE IF NOT EXISTS Ongoing_Watchlist (
+            watchlist_id SERIAL PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            ipo_id INTEGER NOT NULL,
+            expiry_date DATE,
+            FOREIGN KEY (user_id) REFERENCES Users (user_id),
+            FOREIGN KEY (ipo_id) REFERENCES IPOs (ipo_id)
+        );
 
-    conn.commit()
-    conn.close()
+        -- Create Past_Investments table
+        CREATE TABLE IF NOT EXISTS Past_Investments (
+            investment_id SERIAL PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            ipo_id INTEGER NOT NULL,
+            shares_purchased INTEGER NOT NULL,
+            purchase_price DECIMAL(10, 2) NOT NULL,
+            sold_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            status VARCHAR(20) DEFAULT 'pending',
+            FOREIGN KEY (user_id) REFERENCES Users (user_id),
+            FOREIGN KEY (ipo_id) REFERENCES IPOs (ipo_id)
+        );
+
+        -- Covering index for get_user_watchlist (index-only scan on user_id)
+        CREATE INDEX IF NOT EXISTS idx_watchlist_user_ipo
+        ON Ongoing_Watchlist (user_id) INCLUDE (ipo_id, expiry_date, watchlist_id);
+
+        -- Covering index for get_user_investments; its order matches the ORDER BY
+        CREATE INDEX IF NOT EXISTS idx_investments_user_sold
+        ON Past_Investments (user_id, sold_date DESC)
+        INCLUDE (ipo_id, shares_purchased, purchase_price, status);
+
+        -- Covering index for authenticate_user, so login is answered from the
+        -- index without touching the Users heap
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_users_username_cover
+        ON Users (username) INCLUDE (user_id, password_hash, first_name, last_name);
+
+        -- Merge duplicate symbols left over from before ipos_symbol_key existed:
+        -- keep the newest row (highest ipo_id) per symbol, repoint watchlist
+        -- and investment rows at it, then delete the rest. A no-op once the
+        -- unique index is in place.
+        WITH dupes AS (
+            SELECT ipo_id, keep_id
+            FROM (
+                SELECT ipo_id, MAX(ipo_id) OVER (PARTITION BY symbol) AS keep_id
+                FROM IPOs
+            ) AS ranked
+            WHERE ipo_id <> keep_id
+        ), moved_watchlist AS (
+            UPDATE Ongoing_Watchlist AS ow
+            SET ipo_id = dupes.keep_id
+            FROM dupes
+            WHERE ow.ipo_id = dupes.ipo_id
+        ), moved_investments AS (
+            UPDATE Past_Investments AS pi
+            SET ipo_id = dupes.keep_id
+            FROM dupes
+            WHERE pi.ipo_id = dupes.ipo_id
+        )
+        DELETE FROM IPOs WHERE ipo_id IN (SELECT ipo_id FROM dupes);
+
+        -- One row per symbol, so repeated scrapes upsert instead of duplicating
+        CREATE UNIQUE INDEX IF NOT EXISTS ipos_symbol_key ON IPOs (symbol);
+
+        -- Partial indexes for the hot status filters: a user's open positions
+        -- and the upcoming IPO calendar. They only hold the matching rows, so
+        -- they stay small enough to live in shared_buffers
+        CREATE INDEX IF NOT EXISTS idx_inv_pending
+        ON Past_Investments (user_id, investment_id) WHERE status = 'pending';
+
+        CREATE INDEX IF NOT EXISTS idx_ipos_upcoming
+        ON IPOs (ipo_date, symbol) WHERE status = 'upcoming';
+        ''', prepare=False)
 
 # ---------------------------
 # User Related Functions
@@ -99,65 +297,102 @@ def create_user(username, email, password, first_name=None, last_name=None):
     """
     Create a new user with hashed password.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    # Hash the password
-    password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+    # Hash the password before borrowing a connection; argon2id is slow on purpose
+    password_hash = PH.hash(password)
 
     try:
-        cursor.execute(
-            '''
-            INSERT INTO Users (username, email, password_hash, first_name, last_name)
-            VALUES (%s, %s, %s, %s, %s)
-            RETURNING user_id
-            ''',
-            (username, email, password_hash.decode('utf-8'), first_name, last_name)
-        )
-        user_id = cursor.fetchone()[0]
-        conn.commit()
-        conn.close()
-        return user_id
-    except psycopg2.IntegrityError:
+        with get_db_connection() as conn, conn.cursor() as cursor:
+            cursor.execute(
+                '''
+                INSERT INTO Users (username, email, password_hash, first_name, last_name)
+                VALUES (%s, %s, %s, %s, %s)
+                RETURNING user_id
+                ''',
+                (username, email, password_hash, first_name, last_name)
+            )
+            return cursor.fetchone()[0]
+    except psycopg.IntegrityError:
         # Username or email already exists
-        conn.rollback()
-        conn.close()
         return None
 
 def authenticate_user(username, password):
     """
     Authenticate a user by username and password.
+    Users still on a legacy bcrypt hash are moved to argon2id on a successful login.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
+    with get_db_connection() as conn, conn.cursor(row_factory=dict_row) as cursor:
+        cursor.execute('''
+        SELECT user_id, username, password_hash, first_name, last_name
+        FROM Users
+        WHERE username = %s
+        ''', (username,))
+        user = cursor.fetchone()
 
-    cursor.execute('SELECT * FROM Users WHERE username = %s', (username,))
-    user = cursor.fetchone()
+    if user is None:
+        return None
+
+    # Verify after the connection is back in the pool. A malformed stored
+    # hash counts as a failed login rather than an error.
+    password_hash = user['password_hash']
+    if password_hash.startswith('$argon2'):
+        try:
+            PH.verify(password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return None
+        needs_rehash = PH.check_needs_rehash(password_hash)
+    else:
+        # Legacy bcrypt hash
+        try:
+            if not bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8')):
+                return None
+        except ValueError:
+            return None
+        needs_rehash = True
 
-    if user and bcrypt.checkpw(password.encode('utf-8'), user['password_hash'].encode('utf-8')):
-        conn.close()
-        return dict(user)
-    
-    conn.close()
-    return None
+    if needs_rehash:
+        user['password_hash'] = PH.hash(password)
+        update_password_hash(user['user_id'], user['password_hash'])
+
+    return user
+
+def update_password_hash(user_id, password_hash):
+    """
+    Replace a user's stored password hash.
+    """
+    with get_db_connection() as conn, conn.cursor() as cursor:
+        cursor.execute('''
+        UPDATE Users
+        SET password_hash = %s
+        WHERE user_id = %s
+        ''', (password_hash, user_id))
+
+    return True
 
 # ---------------------------
 # IPO Related Functions
 # ---------------------------
 
-def store_ipo(ipo_data):
+# Insert an IPO, or refresh the scraped fields of the stored row with the same symbol
+UPSERT_IPO_SQL = '''
+INSERT INTO IPOs (name, symbol, company_name, offering_price, total_shares, ipo_date, status, description)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+ON CONFLICT (symbol) DO UPDATE
+SET name = EXCLUDED.name,
+    company_name = EXCLUDED.company_name,
+    offering_price = EXCLUDED.offering_price,
+    total_shares = EXCLUDED.total_shares,
+    ipo_date = EXCLUDED.ipo_date,
+    status = EXCLUDED.status,
+    description = EXCLUDED.description,
+    updated_at = NOW()
+RETURNING ipo_id
+'''
+
+def ipo_row(ipo_data):
     """
-    Store scraped IPO data.
-    Expected ipo_data keys: name, symbol, company_name, offering_price, total_shares,
-    ipo_date, status, description.
+    Convert scraped IPO data into a row tuple in IPOs column order.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-    INSERT INTO IPOs (name, symbol, company_name, offering_price, total_shares, ipo_date, status, description)
-    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-    ''', (
+    return (
         ipo_data['name'],
         ipo_data['symbol'],
         ipo_data.get('company_name'),
@@ -166,24 +401,129 @@ def store_ipo(ipo_data):
         ipo_data.get('ipo_date'),
         ipo_data.get('status', 'upcoming'),
         ipo_data.get('description')
-    ))
-    
-    conn.commit()
-    conn.close()
-    return True
+    )
+
+def store_ipo(ipo_data):
+    """
+    Store scraped IPO data and return its ipo_id.
+    If an IPO with the same symbol is already stored, every scraped field is
+    overwritten in place.
+    Expected ipo_data keys: name, symbol, company_name, offering_price, total_shares,
+    ipo_date, status, description.
+    """
+    with get_db_connection() as conn, conn.cursor() as cursor:
+        cursor.execute(UPSERT_IPO_SQL, ipo_row(ipo_data))
+        ipo_id = cursor.fetchone()[0]
+
+    cache_delete(f'ipo:{ipo_id}')
+    return ipo_id
+
+def store_ipos(ipo_list):
+    """
+    Store a batch of scraped IPOs and return their ipo_ids in the same order.
+    Upserts on symbol like store_ipo. Takes the same keys as store_ipo.
+    """
+    if not ipo_list:
+        return []
+
+    ipo_ids = []
+    with get_db_connection() as conn, conn.cursor() as cursor:
+        # executemany pipelines the rows, so the whole batch costs one round-trip
+        cursor.executemany(UPSERT_IPO_SQL, [ipo_row(ipo_data) for ipo_data in ipo_list], returning=True)
+
+        while True:
+            ipo_ids.append(cursor.fetchone()[0])
+            if not cursor.nextset():
+                break
+
+    cache_delete(*(f'ipo:{ipo_id}' for ipo_id in ipo_ids))
+    return ipo_ids
+
+def bulk_load_ipos(ipo_list):
+    """
+    Load a large batch of scraped IPOs with COPY and return how many were stored.
+    Rows are streamed into a temporary staging table, then merged into IPOs in
+    one statement, upserting on symbol like store_ipo. If a symbol appears
+    more than once, the last row wins.
+    Takes the same keys as store_ipo.
+    """
+    if not ipo_list:
+        return 0
+
+    with get_db_connection() as conn, conn.cursor() as cursor:
+        cursor.execute('''
+        CREATE TEMP TABLE ipos_stage (
+            row_num SERIAL,
+            name VARCHAR(255) NOT NULL,
+            symbol VARCHAR(20) NOT NULL,
+            company_name VARCHAR(255),
+            offering_price DECIMAL(10, 2),
+            total_shares INTEGER,
+            ipo_date DATE,
+            status VARCHAR(20),
+            description TEXT
+        ) ON COMMIT DROP
+        ''', prepare=False)
+
+        # COPY skips per-row parse/plan and streams the whole batch at once
+        with cursor.copy('''
+        COPY ipos_stage (name, symbol, company_name, offering_price, total_shares, ipo_date, status, description)
+        FROM STDIN
+        ''') as copy:
+            for ipo_data in ipo_list:
+                copy.write_row(ipo_row(ipo_data))
+
+        cursor.execute('''
+        INSERT INTO IPOs (name, symbol, company_name, offering_price, total_shares, ipo_date, status, description)
+        SELECT DISTINCT ON (symbol)
+            name, symbol, company_name, offering_price, total_shares, ipo_date, status, description
+        FROM ipos_stage
+        ORDER BY symbol, row_num DESC
+        ON CONFLICT (symbol) DO UPDATE
+        SET name = EXCLUDED.name,
+            company_name = EXCLUDED.company_name,
+            offering_price = EXCLUDED.offering_price,
+            total_shares = EXCLUDED.total_shares,
+            ipo_date = EXCLUDED.ipo_date,
+            status = EXCLUDED.status,
+            description = EXCLUDED.description,
+            updated_at = NOW()
+        RETURNING ipo_id
+        ''', prepare=False)
+
+        ipo_ids = [row[0] for row in cursor.fetchall()]
+
+    cache_delete(*(f'ipo:{ipo_id}' for ipo_id in ipo_ids))
+    return len(ipo_ids)
 
 def get_ipo(ipo_id):
     """
     Retrieve a single IPO by its ID.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-    
-    cursor.execute('SELECT * FROM IPOs WHERE ipo_id = %s', (ipo_id,))
-    ipo = cursor.fetchone()
-    conn.close()
-    
-    return dict(ipo) if ipo else None
+    key = f'ipo:{ipo_id}'
+    ipo = cache_get(key)
+    if ipo is not None:
+        return ipo
+
+    with get_db_connection() as conn, conn.cursor(row_factory=dict_row) as cursor:
+        cursor.execute('SELECT * FROM IPOs WHERE ipo_id = %s', (ipo_id,))
+        ipo = cursor.fetchone()
+
+    if ipo is not None:
+        cache_set(key, ipo, IPO_CACHE_TTL)
+    return ipo
+
+def get_ipo_summary(ipo_id):
+    """
+    Retrieve the fields of an IPO needed for list views.
+    """
+    with get_db_connection() as conn, conn.cursor(row_factory=dict_row) as cursor:
+        cursor.execute('''
+        SELECT name, symbol, offering_price, ipo_date, status
+        FROM IPOs
+        WHERE ipo_id = %s
+        ''', (ipo_id,))
+        return cursor.fetchone()
 
 # ---------------------------
 # Ongoing Watchlist Functions
@@ -193,53 +533,54 @@ def add_to_watchlist(user_id, ipo_id, expiry_date=None):
     """
     Add an IPO to a user's watchlist.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-    INSERT INTO Ongoing_Watchlist (user_id, ipo_id, expiry_date)
-    VALUES (%s, %s, %s)
-    RETURNING watchlist_id
-    ''', (user_id, ipo_id, expiry_date))
-    
-    watchlist_id = cursor.fetchone()[0]
-    conn.commit()
-    conn.close()
+    with get_db_connection() as conn, conn.cursor() as cursor:
+        cursor.execute('''
+        INSERT INTO Ongoing_Watchlist (user_id, ipo_id, expiry_date)
+        VALUES (%s, %s, %s)
+        RETURNING watchlist_id
+        ''', (user_id, ipo_id, expiry_date))
+
+        watchlist_id = cursor.fetchone()[0]
+
+    cache_delete(f'wl:{user_id}')
     return watchlist_id
 
 def remove_from_watchlist(watchlist_id, user_id):
     """
     Remove an IPO from a user's watchlist.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-    DELETE FROM Ongoing_Watchlist
-    WHERE watchlist_id = %s AND user_id = %s
-    ''', (watchlist_id, user_id))
-    
-    conn.commit()
-    conn.close()
+    with get_db_connection() as conn, conn.cursor() as cursor:
+        cursor.execute('''
+        DELETE FROM Ongoing_Watchlist
+        WHERE watchlist_id = %s AND user_id = %s
+        ''', (watchlist_id, user_id))
+
+    cache_delete(f'wl:{user_id}')
     return True
 
+WATCHLIST_SQL = '''
+SELECT ow.watchlist_id, ow.expiry_date, i.*
+FROM Ongoing_Watchlist AS ow
+JOIN IPOs AS i ON ow.ipo_id = i.ipo_id
+WHERE ow.user_id = %s
+ORDER BY i.ipo_date ASC
+'''
+
 def get_user_watchlist(user_id):
     """
     Get the watchlist for a given user, including IPO details.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-    
-    cursor.execute('''
-    SELECT ow.watchlist_id, ow.expiry_date, i.*
-    FROM Ongoing_Watchlist AS ow
-    JOIN IPOs AS i ON ow.ipo_id = i.ipo_id
-    WHERE ow.user_id = %s
-    ORDER BY i.ipo_date ASC
-    ''', (user_id,))
-    
-    watchlist = [dict(row) for row in cursor.fetchall()]
-    conn.close()
+    key = f'wl:{user_id}'
+    watchlist = cache_get(key)
+    if watchlist is not None:
+        return watchlist
+
+    with get_db_connection() as conn, conn.cursor(row_factory=dict_row) as cursor:
+        cursor.execute(WATCHLIST_SQL, (user_id,))
+
+        watchlist = cursor.fetchall()
+
+    cache_set(key, watchlist, WATCHLIST_CACHE_TTL)
     return watchlist
 
 # ---------------------------
@@ -250,60 +591,136 @@ def add_investment(user_id, ipo_id, shares_purchased, purchase_price, sold_date=
     """
     Record a new past investment.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-    INSERT INTO Past_Investments (user_id, ipo_id, shares_purchased, purchase_price, sold_date, status)
-    VALUES (%s, %s, %s, %s, %s, %s)
-    RETURNING investment_id
-    ''', (user_id, ipo_id, shares_purchased, purchase_price, sold_date, status))
-    
-    investment_id = cursor.fetchone()[0]
-    conn.commit()
-    conn.close()
-    return investment_id
+    with get_db_connection() as conn, conn.cursor() as cursor:
+        cursor.execute('''
+        INSERT INTO Past_Investments (user_id, ipo_id, shares_purchased, purchase_price, sold_date, status)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        RETURNING investment_id
+        ''', (user_id, ipo_id, shares_purchased, purchase_price, sold_date, status))
+
+        return cursor.fetchone()[0]
+
+# Built once so every call sends the same statement text and reuses one prepared plan
+UPDATE_INV_SQL = sql.SQL('''
+UPDATE Past_Investments
+SET status = %s, sold_date = COALESCE(%s, sold_date)
+WHERE investment_id = %s AND user_id = %s
+''')
 
 def update_investment_status(investment_id, user_id, status, sold_date=None):
     """
     Update the status (and optionally the sold_date) of an investment.
+    A sold_date of None leaves the stored sold_date unchanged.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    if sold_date:
-        cursor.execute('''
-        UPDATE Past_Investments
-        SET status = %s, sold_date = %s
-        WHERE investment_id = %s AND user_id = %s
-        ''', (status, sold_date, investment_id, user_id))
-    else:
-        cursor.execute('''
-        UPDATE Past_Investments
-        SET status = %s
-        WHERE investment_id = %s AND user_id = %s
-        ''', (status, investment_id, user_id))
-    
-    conn.commit()
-    conn.close()
+    with get_db_connection() as conn, conn.cursor() as cursor:
+        cursor.execute(UPDATE_INV_SQL, (status, sold_date, investment_id, user_id))
+
     return True
 
+@dataclass(slots=True)
+class Investment:
+    """A row of USER_INVESTMENTS_SQL: a past investment plus its IPO's name, symbol and date."""
+    investment_id: int
+    user_id: int
+    ipo_id: int
+    shares_purchased: int
+    purchase_price: Decimal
+    sold_date: Optional[datetime]
+    status: str
+    ipo_name: str
+    symbol: str
+    ipo_date: Optional[date]
+
+# Columns are listed to match Investment's fields one-for-one: class_row passes
+# every returned column to Investment(...) as a keyword argument
+USER_INVESTMENTS_SQL = '''
+SELECT pi.investment_id, pi.user_id, pi.ipo_id, pi.shares_purchased, pi.purchase_price,
+       pi.sold_date, pi.status, i.name AS ipo_name, i.symbol, i.ipo_date
+FROM Past_Investments AS pi
+JOIN IPOs AS i ON pi.ipo_id = i.ipo_id
+WHERE pi.user_id = %s
+ORDER BY pi.sold_date DESC
+'''
+
 def get_user_investments(user_id):
     """
     Get all past investments for a given user.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
-    
-    cursor.execute('''
-    SELECT pi.*, i.name AS ipo_name, i.symbol, i.ipo_date
-    FROM Past_Investments AS pi
-    JOIN IPOs AS i ON pi.ipo_id = i.ipo_id
-    WHERE pi.user_id = %s
-    ORDER BY pi.sold_date DESC
-    ''', (user_id,))
-    
-    investments = [dict(row) for row in cursor.fetchall()]
-    conn.close()
-    return investments
+    with get_db_connection() as conn, conn.cursor(row_factory=dict_row) as cursor:
+        cursor.execute(USER_INVESTMENTS_SQL, (user_id,))
+
+        return cursor.fetchall()
+
+def iter_user_investments(user_id, itersize=500):
+    """
+    Yield a user's past investments one at a time, as Investment objects.
+    Rows are streamed from a server-side cursor in batches of itersize, so a
+    long history is never held in memory all at once. The pooled connection
+    stays checked out until the generator is exhausted or closed.
+    """
+    with get_db_connection() as conn, conn.cursor(name='investments_cur', row_factory=class_row(Investment)) as cursor:
+        cursor.itersize = itersize
+        cursor.execute(USER_INVESTMENTS_SQL, (user_id,))
+
+        yield from cursor
+
+def encode_json_default(value):
+    """Encode the column types orjson can't serialize natively."""
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f'Cannot serialize value of type {type(value).__name__}')
+
+def iter_user_investments_json(user_id):
+    """
+    Yield a user's past investments as chunks of a JSON array.
+    Rows go straight from the server-side cursor to orjson, so the chunks can
+    be handed to a streaming response without building the list first.
+    """
+    yield b'['
+    for i, investment in enumerate(iter_user_investments(user_id)):
+        if i:
+            yield b','
+        yield orjson.dumps(investment, default=encode_json_default)
+    yield b']'
+
+def get_user_investments_json(user_id):
+    """
+    Get all past investments for a given user as a JSON array (bytes).
+    """
+    return b''.join(iter_user_investments_json(user_id))
+
+# ---------------------------
+# Dashboard Functions
+# ---------------------------
+
+def get_user_portfolio(user_id):
+    """
+    Get a user's watchlist and past investments together.
+    Both queries are in flight at the same time, so the caller waits for the
+    slower of the two instead of their sum.
+    """
+    watchlist = QUERY_EXECUTOR.submit(get_user_watchlist, user_id)
+    investments = QUERY_EXECUTOR.submit(get_user_investments, user_id)
+
+    return {
+        'watchlist': watchlist.result(),
+        'investments': investments.result()
+    }
+
+def get_watchlist_page(user_id, ipo_ids):
+    """
+    Get everything a watchlist page renders: the given IPOs and the user's watchlist.
+    Both queries are sent in pipeline mode on one connection, so the page
+    costs a single round-trip.
+    """
+    with get_db_connection() as conn, \
+            conn.cursor(row_factory=dict_row) as ipos_cursor, \
+            conn.cursor(row_factory=dict_row) as watchlist_cursor:
+        with conn.pipeline():
+            ipos_cursor.execute('SELECT * FROM IPOs WHERE ipo_id = ANY(%s)', (list(ipo_ids),))
+            watchlist_cursor.execute(WATCHLIST_SQL, (user_id,))
 
+        return {
+            'ipos': ipos_cursor.fetchall(),
+            'watchlist': watchlist_cursor.fetchall()
+        }